@@ -5,7 +5,7 @@ import typer
 from shapely import wkt
 
 from arcpy2foss.extent import extents_to_features
-from arcpy2foss.gpx import to_gpx
+from arcpy2foss.gpx import gpx_to_vector, to_gpx
 from arcpy2foss.sjoin import conditional_sjoin
 
 app = typer.Typer()
@@ -41,6 +41,29 @@ def vector_to_gpx(
     return to_gpx(input_file=input_file, output_file=output_file)
 
 
+@app.command(name="gpx-to-vector")
+def gpx_files_to_vector(
+    input_files: List[str] = typer.Argument(..., help="List of 1 or more GPX files"),
+    output_file: str = typer.Option(..., help="Path to output vector file"),
+    output_format: str = typer.Option(default="GPKG", help="Output vector file format (GPKG or Parquet)"),
+    max_workers: Optional[int] = typer.Option(default=None, help="Number of worker processes, defaults to CPU count"),
+):
+    """
+    Convert many GPX files into a single track and point dataset.
+
+    Files are parsed in parallel and the track points of every file are merged
+    into one dataset with a "source_file" column. GeoPackage output contains a
+    "tracks" and a "track_points" layer, GeoParquet output writes the points to
+    a second "<stem>_points.parquet" file next to the tracks.
+    """
+    return gpx_to_vector(
+        input_files=input_files,
+        output_file=output_file,
+        output_format=output_format,
+        max_workers=max_workers,
+    )
+
+
 @app.command()
 def conditional_spatial_join(
     left: str = typer.Option(..., help="Source vector file"),
@@ -1,8 +1,14 @@
+import os
+import warnings
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import geopandas as gpd
 import gpxpy.gpx
+import numpy as np
+import pandas as pd
 from shapely.geometry import LineString
 
 
@@ -145,3 +151,293 @@ def to_gpx(input_file: Path, output_file: Path) -> None:
 
     # Save as GPX
     write_gpx(gdf=out, output_file=output_file)
+
+
+# pandas >= 2 infers a single format from the first string unless told otherwise,
+# which silently turns mixed ISO 8601 variants (fractional seconds, offsets) into NaT
+_ISO8601_KWARGS = {"format": "ISO8601"} if int(pd.__version__.split(".")[0]) >= 2 else {}
+
+
+def _local_name(tag: str) -> str:
+    """Strip any XML namespace from an element tag"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _to_utc_datetime64(times: Iterable[Optional[str]], source: str) -> np.ndarray:
+    """Convert ISO 8601 strings to a (timezone naive) UTC datetime64 array
+
+    Strings that cannot be parsed become NaT, with a warning naming ``source``.
+    """
+    raw = pd.Series(list(times), dtype="object")
+    parsed = pd.to_datetime(raw, utc=True, errors="coerce", **_ISO8601_KWARGS)
+
+    n_coerced = int((parsed.isna() & raw.notna()).sum())
+    if n_coerced:
+        warnings.warn(f"{source} : {n_coerced} track point time(s) could not be parsed and were set to NaT")
+
+    return parsed.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
+
+
+def parse_gpx_tracks(input_file: Path) -> Dict[str, np.ndarray]:
+    """Parse the track points of a GPX file straight into arrays
+
+    The file is streamed with ``xml.etree.ElementTree.iterparse`` rather than
+    being loaded with ``gpxpy`` so that no object tree is built for each point.
+    Processed elements are detached from the document as the parse goes, so
+    memory use does not grow with the number of points.
+
+    Parameters
+    ----------
+    input_file : Path
+        GPX file to parse
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Arrays of equal length with one entry per track point : "x" (longitude),
+        "y" (latitude), "elevation", "time" (UTC), "track_id" and "segment_id".
+        Track and segment IDs are zero-based and local to the file.
+        Times that cannot be parsed are set to NaT with a warning.
+    """
+    lons, lats, eles, times, track_ids, segment_ids = [], [], [], [], [], []
+    track_id, segment_id = 0, 0
+    ele, time = np.nan, None
+
+    # stack of currently open elements, used to find the parent of each element
+    open_elems: List[ET.Element] = []
+
+    for event, elem in ET.iterparse(str(input_file), events=("start", "end")):
+        if event == "start":
+            open_elems.append(elem)
+            if _local_name(elem.tag) == "trkpt":
+                ele, time = np.nan, None
+            continue
+
+        open_elems.pop()
+        parent = open_elems[-1] if open_elems else None
+        name = _local_name(elem.tag)
+        parent_name = _local_name(parent.tag) if parent is not None else None
+
+        # only accept <ele>/<time> that are direct children of the track point
+        # (i.e. not any nested inside <extensions>)
+        if parent_name == "trkpt" and name == "ele" and elem.text:
+            ele = float(elem.text)
+        elif parent_name == "trkpt" and name == "time":
+            time = elem.text
+        elif name == "trkpt":
+            lons.append(float(elem.get("lon")))
+            lats.append(float(elem.get("lat")))
+            eles.append(ele)
+            times.append(time)
+            track_ids.append(track_id)
+            segment_ids.append(segment_id)
+        elif name == "trkseg":
+            segment_id += 1
+        elif name == "trk":
+            track_id += 1
+            segment_id = 0
+
+        # detach finished points, segments and top-level elements from the tree
+        if parent is not None and (name in ("trkpt", "trkseg") or parent is open_elems[0]):
+            elem.clear()
+            parent.remove(elem)
+
+    return {
+        "x": np.asarray(lons, dtype="float64"),
+        "y": np.asarray(lats, dtype="float64"),
+        "elevation": np.asarray(eles, dtype="float64"),
+        "time": _to_utc_datetime64(times, source=str(input_file)),
+        "track_id": np.asarray(track_ids, dtype="int64"),
+        "segment_id": np.asarray(segment_ids, dtype="int64"),
+    }
+
+
+def _parse_gpx_file(input_file: str) -> Tuple[str, Optional[Dict[str, np.ndarray]], Optional[str], List[str]]:
+    """Process pool worker returning the file name, its parsed arrays, any error and any warnings
+
+    Errors and warnings are returned rather than raised so one malformed or
+    unreadable file does not abort the whole ingest, and so warnings raised in
+    the worker process can be re-emitted by the parent.
+    """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            arrays, error = parse_gpx_tracks(input_file), None
+        except (ET.ParseError, OSError, TypeError, ValueError) as err:
+            arrays, error = None, f"{type(err).__name__}: {err}"
+
+    return input_file, arrays, error, [str(w.message) for w in caught]
+
+
+def points_to_tracks(points: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Build one LineString per track segment from parsed track points
+
+    Parameters
+    ----------
+    points : gpd.GeoDataFrame
+        Track points as created by ``gpx_files_to_gdf``. Points of a segment
+        must be consecutive; a new segment starts wherever the ``file_id``,
+        ``track_id`` or ``segment_id`` changes.
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        One row per segment with at least two points, with the start/end time
+        and number of points of each segment
+    """
+    keys = ["file_id", "track_id", "segment_id"]
+    n = len(points)
+
+    # segment boundaries follow the array order, not the key values
+    changed = np.zeros(max(n - 1, 0), dtype=bool)
+    for key in keys:
+        changed |= np.diff(points[key].to_numpy()) != 0
+    starts = np.concatenate([[0], np.flatnonzero(changed) + 1]) if n else np.array([], dtype="int64")
+    segment_index = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    times = points["time"].groupby(segment_index)
+    tracks = points.iloc[starts][["source_file", *keys]].reset_index(drop=True)
+    tracks["start_time"] = times.min().to_numpy()
+    tracks["end_time"] = times.max().to_numpy()
+    tracks["n_points"] = np.diff(np.append(starts, n))
+
+    coords = np.column_stack([points.geometry.x.to_numpy(), points.geometry.y.to_numpy()])
+    geoms = [LineString(seg) if len(seg) > 1 else None for seg in np.split(coords, starts[1:])] if n else []
+
+    tracks = gpd.GeoDataFrame(tracks, geometry=geoms, crs=points.crs)
+    return tracks[tracks.n_points > 1].reset_index(drop=True)
+
+
+def gpx_files_to_gdf(
+    input_files: Iterable[Path], max_workers: Optional[int] = None
+) -> Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
+    """Parse many GPX files in a process pool into track and point GeoDataFrames
+
+    Files that cannot be read or parsed are skipped with a warning naming each file.
+
+    Parameters
+    ----------
+    input_files : Iterable[Path]
+        GPX files to parse
+    max_workers : Optional[int], optional
+        Number of worker processes, by default the number of CPUs
+
+    Returns
+    -------
+    Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]
+        Tracks (one LineString per track segment) and track points, both in
+        WGS-84 and with a ``source_file`` and a per-input ``file_id`` column
+
+    Raises
+    ------
+    ValueError
+        If no input files are given, or none of them could be parsed
+    """
+    input_files = [str(f) for f in input_files]
+    if not input_files:
+        raise ValueError("At least one input GPX file is required")
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # send files to the workers in batches to keep the IPC overhead low
+    chunksize = max(1, len(input_files) // (max_workers * 4))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_parse_gpx_file, input_files, chunksize=chunksize))
+
+    for *_, messages in results:
+        for message in messages:
+            warnings.warn(message)
+
+    failed = [(fn, err) for fn, _, err, _ in results if err is not None]
+    if failed:
+        details = "; ".join(f"{fn} ({err})" for fn, err in failed)
+        warnings.warn(f"Skipped {len(failed)} GPX file(s) that could not be parsed : {details}")
+
+    parsed = [(fn, arr) for fn, arr, err, _ in results if err is None]
+    if not parsed:
+        raise ValueError("None of the input GPX files could be parsed")
+
+    columns = ["x", "y", "elevation", "time", "track_id", "segment_id"]
+    arrays = {col: np.concatenate([arr[col] for _, arr in parsed]) for col in columns}
+    counts = [len(arr["x"]) for _, arr in parsed]
+    file_ids = np.repeat(np.arange(len(parsed), dtype="int64"), counts)
+
+    # the same path may be given more than once, so categories are the unique names
+    name_codes, names = pd.factorize(np.array([fn for fn, _ in parsed], dtype="object"))
+
+    points = gpd.GeoDataFrame(
+        {
+            # categorical so each file name is stored once rather than per point
+            "source_file": pd.Categorical.from_codes(np.repeat(name_codes, counts), categories=names),
+            "file_id": file_ids,
+            "track_id": arrays["track_id"],
+            "segment_id": arrays["segment_id"],
+            "time": pd.to_datetime(arrays["time"], utc=True),
+            "elevation": arrays["elevation"],
+        },
+        geometry=gpd.points_from_xy(arrays["x"], arrays["y"]),
+        crs=4326,
+    )
+
+    return points_to_tracks(points), points
+
+
+def gpx_to_vector(
+    input_files: Iterable[Path],
+    output_file: Path,
+    output_format: str = "GPKG",
+    max_workers: Optional[int] = None,
+) -> None:
+    """Convert many GPX files into a single track and point vector dataset
+
+    Parameters
+    ----------
+    input_files : Iterable[Path]
+        GPX files to convert, parsed in parallel
+    output_file : Path
+        Path to the output dataset.
+        For GeoPackage this contains a "tracks" and a "track_points" layer, any
+        existing file is replaced and the "tracks" layer is only written if at
+        least one segment has 2 or more points (a warning is raised otherwise).
+        For GeoParquet this contains the tracks (possibly empty) and the points
+        are written alongside as ``<stem>_points.parquet``.
+    output_format : str, optional
+        Either "GPKG" or "Parquet", by default "GPKG"
+    max_workers : Optional[int], optional
+        Number of worker processes, by default the number of CPUs
+
+    Raises
+    ------
+    ValueError
+        If the ``output_format`` is not supported
+    ValueError
+        If the input files do not contain any track points
+    """
+    fmt = output_format.lower()
+    if fmt not in ("gpkg", "parquet"):
+        raise ValueError(f"Invalid output format : {output_format} (allowed : ('GPKG', 'Parquet'))")
+
+    tracks, points = gpx_files_to_gdf(input_files=input_files, max_workers=max_workers)
+
+    if points.empty:
+        raise ValueError("No track points found in the input GPX files")
+
+    if tracks.empty:
+        warnings.warn("No track segments with 2 or more points found")
+
+    output_file = Path(output_file)
+
+    if fmt == "gpkg":
+        # replace rather than update an existing file so no stale layers remain
+        if output_file.exists():
+            output_file.unlink()
+
+        # geopandas < 0.11 cannot write empty layers to file
+        if not tracks.empty:
+            tracks.to_file(output_file, layer="tracks", driver="GPKG")
+        points.to_file(output_file, layer="track_points", driver="GPKG")
+
+    else:
+        tracks.to_parquet(output_file)
+        points.to_parquet(output_file.with_name(f"{output_file.stem}_points.parquet"))
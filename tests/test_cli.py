@@ -40,3 +40,14 @@ def test_cli_vector_to_gpx(resources_dir: str, tmp_path: Path):
 
     assert result.exit_code == 0
     assert os.path.exists(out_fn)
+
+
+def test_cli_gpx_to_vector(resources_dir: str, tmp_path: Path):
+    fn = os.path.join(resources_dir, "track.gpx")
+    out_fn = tmp_path / "test.gpkg"
+
+    args = ["gpx-to-vector", fn, "--output-file", str(out_fn), "--max-workers", "1"]
+    result = runner.invoke(app, args)
+
+    assert result.exit_code == 0
+    assert os.path.exists(out_fn)
@@ -1,11 +1,14 @@
 import os
 from pathlib import Path
 
+import fiona
 import geopandas as gpd
+import numpy as np
+import pandas as pd
 import pytest
 from shapely.geometry import MultiLineString
 
-from arcpy2foss.gpx import to_gpx
+from arcpy2foss.gpx import gpx_files_to_gdf, gpx_to_vector, parse_gpx_tracks, to_gpx
 
 
 def test_to_gpx_points(resources_dir: str, tmp_path: Path):
@@ -40,3 +43,167 @@ def test_to_gpx_points_to_track(resources_dir: str, tmp_path: Path):
     assert isinstance(out, gpd.GeoDataFrame)
     assert len(out) == 1
     assert isinstance(out.geometry.iloc[0], MultiLineString)
+
+
+def test_parse_gpx_tracks(resources_dir: str):
+    fn = os.path.join(resources_dir, "track.gpx")
+
+    out = parse_gpx_tracks(fn)
+    assert len(out["x"]) == 5
+    assert out["track_id"].tolist() == [0, 0, 0, 0, 0]
+    assert out["segment_id"].tolist() == [0, 0, 0, 1, 1]
+    assert pytest.approx(out["y"][0], rel=1e-5) == 54.58825
+    assert pytest.approx(out["x"][0], rel=1e-5) == -1.18912
+    assert out["elevation"][1] == 11.5
+    assert np.isnan(out["elevation"][4])
+    assert out["time"][0] == np.datetime64("2021-11-01T10:00:00")
+
+
+def test_gpx_files_to_gdf(resources_dir: str):
+    fn = os.path.join(resources_dir, "track.gpx")
+
+    tracks, points = gpx_files_to_gdf([fn, fn], max_workers=2)
+    assert len(points) == 10
+    assert len(tracks) == 4
+    assert set(points.source_file) == {fn}
+    assert tracks.n_points.tolist() == [3, 2, 3, 2]
+    assert tracks.file_id.tolist() == [0, 0, 1, 1]
+    assert tracks.crs.to_epsg() == 4326
+
+    # the vertices of each LineString must match the points of its segment
+    first_seg = points[(points.file_id == 1) & (points.segment_id == 0)]
+    assert list(tracks.geometry.iloc[2].coords) == [(p.x, p.y) for p in first_seg.geometry]
+
+
+def test_gpx_files_to_gdf_different_files(resources_dir: str):
+    files = [os.path.join(resources_dir, f) for f in ["track.gpx", "track_mixed_times.gpx"]]
+
+    tracks, points = gpx_files_to_gdf(files, max_workers=2)
+    assert len(points) == 8
+    assert tracks.n_points.tolist() == [3, 2, 3]
+    assert tracks.source_file.tolist() == [files[0], files[0], files[1]]
+    assert points.source_file.value_counts().to_dict() == {files[0]: 5, files[1]: 3}
+    assert isinstance(points.source_file.dtype, pd.CategoricalDtype)
+
+
+def test_gpx_files_to_gdf_skips_invalid(resources_dir: str):
+    files = [os.path.join(resources_dir, f) for f in ["track.gpx", "truncated.gpx"]]
+
+    with pytest.warns(UserWarning, match="truncated.gpx"):
+        tracks, points = gpx_files_to_gdf(files, max_workers=1)
+
+    assert len(points) == 5
+    assert set(points.source_file) == {files[0]}
+
+
+def test_gpx_files_to_gdf_skips_missing(resources_dir: str, tmp_path: Path):
+    files = [os.path.join(resources_dir, "track.gpx"), str(tmp_path / "missing.gpx")]
+
+    with pytest.warns(UserWarning, match="missing.gpx"):
+        tracks, points = gpx_files_to_gdf(files, max_workers=1)
+
+    assert len(points) == 5
+
+
+def test_gpx_files_to_gdf_warns_bad_times(resources_dir: str):
+    fn = os.path.join(resources_dir, "track_bad_time.gpx")
+
+    with pytest.warns(UserWarning, match="track_bad_time.gpx : 1 track point time"):
+        tracks, points = gpx_files_to_gdf([fn], max_workers=1)
+
+    assert len(points) == 2
+    assert points.time.isna().tolist() == [False, True]
+
+
+def test_gpx_files_to_gdf_all_invalid(resources_dir: str):
+    fn = os.path.join(resources_dir, "truncated.gpx")
+
+    with pytest.warns(UserWarning), pytest.raises(ValueError):
+        gpx_files_to_gdf([fn], max_workers=1)
+
+
+def test_parse_gpx_tracks_mixed_times(resources_dir: str):
+    fn = os.path.join(resources_dir, "track_mixed_times.gpx")
+
+    out = parse_gpx_tracks(fn)
+    expected = np.array(
+        ["2021-11-01T10:00:00", "2021-11-01T10:00:05.123", "2021-11-01T10:00:10"],
+        dtype="datetime64[ns]",
+    )
+    np.testing.assert_array_equal(out["time"], expected)
+
+    # values nested in <extensions> must not override the track point values
+    assert out["elevation"].tolist() == [10.0, 11.5, 12.0]
+
+
+def test_gpx_to_vector_gpkg(resources_dir: str, tmp_path: Path):
+    fn = os.path.join(resources_dir, "track.gpx")
+    out_fn = tmp_path / "test.gpkg"
+
+    gpx_to_vector(input_files=[fn], output_file=out_fn, max_workers=1)
+    assert os.path.exists(out_fn)
+
+    tracks = gpd.read_file(out_fn, layer="tracks")
+    assert len(tracks) == 2
+    assert "source_file" in tracks.columns
+
+    points = gpd.read_file(out_fn, layer="track_points")
+    assert len(points) == 5
+
+
+def test_gpx_to_vector_invalid_format(resources_dir: str, tmp_path: Path):
+    fn = os.path.join(resources_dir, "track.gpx")
+
+    with pytest.raises(ValueError):
+        gpx_to_vector(input_files=[fn], output_file=tmp_path / "test.geojson", output_format="GeoJSON")
+
+
+def test_gpx_to_vector_parquet(resources_dir: str, tmp_path: Path):
+    files = [os.path.join(resources_dir, f) for f in ["track.gpx", "track_mixed_times.gpx"]]
+    out_fn = tmp_path / "test.parquet"
+
+    gpx_to_vector(input_files=files, output_file=out_fn, output_format="Parquet", max_workers=2)
+    assert os.path.exists(out_fn)
+    assert os.path.exists(tmp_path / "test_points.parquet")
+
+    tracks = gpd.read_parquet(out_fn)
+    assert len(tracks) == 3
+    assert set(tracks.source_file) == set(files)
+
+    points = gpd.read_parquet(tmp_path / "test_points.parquet")
+    assert len(points) == 8
+    assert set(points.source_file) == set(files)
+
+
+def test_gpx_to_vector_no_tracks(resources_dir: str, tmp_path: Path):
+    fn = os.path.join(resources_dir, "waypoints.gpx")
+    out_fn = tmp_path / "test.gpkg"
+
+    with pytest.warns(UserWarning, match="No track segments"):
+        gpx_to_vector(input_files=[fn], output_file=out_fn, max_workers=1)
+
+    points = gpd.read_file(out_fn, layer="track_points")
+    assert len(points) == 1
+
+
+def test_gpx_to_vector_no_tracks_parquet(resources_dir: str, tmp_path: Path):
+    fn = os.path.join(resources_dir, "waypoints.gpx")
+    out_fn = tmp_path / "test.parquet"
+
+    with pytest.warns(UserWarning, match="No track segments"):
+        gpx_to_vector(input_files=[fn], output_file=out_fn, output_format="Parquet", max_workers=1)
+
+    assert len(gpd.read_parquet(out_fn)) == 0
+    assert len(gpd.read_parquet(tmp_path / "test_points.parquet")) == 1
+
+
+def test_gpx_to_vector_gpkg_rerun(resources_dir: str, tmp_path: Path):
+    out_fn = tmp_path / "test.gpkg"
+
+    gpx_to_vector(input_files=[os.path.join(resources_dir, "track.gpx")], output_file=out_fn, max_workers=1)
+    with pytest.warns(UserWarning, match="No track segments"):
+        gpx_to_vector(input_files=[os.path.join(resources_dir, "waypoints.gpx")], output_file=out_fn, max_workers=1)
+
+    # no stale tracks from the first run may remain next to the new points
+    assert fiona.listlayers(out_fn) == ["track_points"]
+    assert len(gpd.read_file(out_fn, layer="track_points")) == 1